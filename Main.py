@@ -10,18 +10,38 @@ Options:
     --mode [receiver|analytics|dashboard|monitor]
     --config [path to config file]
     --debug [enable debug mode]
+    --poll-interval [seconds between file checks without inotify]
+    --no-color [disable colored output]
 
 Author: Your Name
 Version: 1.0.0
 """
 
 import sys
-import argparse
+import csv
+import functools
+import math
 import os
 import time
-import signal
-import subprocess
-from datetime import datetime
+
+# Network filesystems where inotify misses writes made by other hosts
+REMOTE_FS_TYPES = ('nfs', 'nfs4', 'cifs', 'smb3', 'smbfs', 'fuse.sshfs')
+
+REQUIRED_FILES = {
+    'receiver': 'receiver/receiver_fixed.py',
+    'analytics': 'analytics/aqi_forecasting.py',
+    'dashboard': 'dashboard/index.html'
+}
+
+REQUIRED_PACKAGES = ('spidev', 'RPi.GPIO')
+SPI_DEVICE = '/dev/spidev0.0'
+
+# Written by the receiver process so other instances can see it running
+RECEIVER_PID_FILE = 'receiver/receiver.pid'
+
+# Hash of the last successful dependency check. Kept as plain text: under
+# sudo -E this path can be user-writable, so it must never be deserialized.
+DEPS_CACHE_FILE = os.path.expanduser('~/.cache/aqi_monitor/deps.sha1')
 
 # ANSI color codes for terminal output
 class Colors:
@@ -33,15 +53,278 @@ class Colors:
     MAGENTA = '\033[95m'
     RESET = '\033[0m'
     BOLD = '\033[1m'
+    
+    @classmethod
+    def disable(cls):
+        """Turn every color code into an empty string"""
+        for name in dir(cls):
+            if name.isupper():
+                setattr(cls, name, '')
+
+# No escape codes when piped or when NO_COLOR is set (https://no-color.org)
+if not sys.stdout.isatty() or os.environ.get('NO_COLOR'):
+    Colors.disable()
+
+def is_remote_filesystem(path):
+    """Return True if path lives on a network mount listed in /proc/mounts"""
+    path = os.path.realpath(path)
+    best_mount, best_type = '', ''
+    try:
+        with open('/proc/mounts', 'r') as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) < 3:
+                    continue
+                mount_point, fs_type = fields[1], fields[2]
+                inside = path == mount_point or path.startswith(mount_point.rstrip('/') + '/')
+                if inside and len(mount_point) > len(best_mount):
+                    best_mount, best_type = mount_point, fs_type
+    except OSError:
+        return False
+    return best_type in REMOTE_FS_TYPES
+
+def count_lines(path, block_size=1 << 20):
+    """Count lines in path by scanning raw bytes in fixed-size blocks"""
+    lines = 0
+    last_block = b''
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            lines += block.count(b'\n')
+            last_block = block
+    if last_block and not last_block.endswith(b'\n'):
+        lines += 1  # Final line without a newline
+    return lines
+
+def tail_start(f, end, n, block_size=8192):
+    """Return the offset in binary file f where the last n lines before end begin"""
+    position = end
+    data = b''
+    while position > 0:
+        step = min(block_size, position)
+        position -= step
+        f.seek(position)
+        data = f.read(step) + data
+        
+        # The newline that terminates the final line doesn't start a new one
+        index = len(data) - 1 if data.endswith(b'\n') else len(data)
+        for _ in range(n):
+            index = data.rfind(b'\n', 0, index)
+            if index < 0:
+                break
+        else:
+            return position + index + 1
+    return 0
+
+def tail_lines(path, n=20):
+    """Return the last n lines of path, reading backwards from the end"""
+    if n <= 0:
+        return []
+    with open(path, 'rb') as f:
+        end = f.seek(0, os.SEEK_END)
+        start = tail_start(f, end, n)
+        f.seek(start)
+        data = f.read(end - start)
+    return data.decode('utf-8', errors='replace').splitlines()[-n:]
+
+def last_line_start(f, end):
+    """Return the offset in binary file f where its last complete line before end starts"""
+    if end == 0:
+        return 0
+    f.seek(end - 1)
+    complete = f.read(1) == b'\n'
+    # Step over a trailing line that is still being written
+    return tail_start(f, end, 1 if complete else 2)
+
+def tail_position(path):
+    """Return the (inode, offset) at which the last complete line of path starts"""
+    with open(path, 'rb') as f:
+        inode = os.fstat(f.fileno()).st_ino
+        return inode, last_line_start(f, f.seek(0, os.SEEK_END))
+
+def read_appended(path, position, skip_header=False, from_tail=False):
+    """Return (complete lines appended after position, new position)
+
+    position is an (inode, offset) pair. A file that was replaced (new
+    inode) or shrank is read again from the start, or only from its last
+    complete line when from_tail is set; skip_header drops the first line
+    whenever reading starts at offset 0. A trailing line still being
+    written is left for the next call.
+    """
+    inode, offset = position
+    with open(path, 'rb') as f:
+        current_inode = os.fstat(f.fileno()).st_ino
+        end = f.seek(0, os.SEEK_END)
+        if current_inode != inode or end < offset:
+            # File was truncated, rotated or replaced
+            offset = last_line_start(f, end) if from_tail else 0
+        f.seek(offset)
+        chunk = f.read()
+    
+    lines = chunk.split(b'\n')
+    trailing_partial = lines.pop()
+    new_position = (current_inode, offset + len(chunk) - len(trailing_partial))
+    if skip_header and offset == 0 and lines:
+        lines.pop(0)
+    return lines, new_position
+
+def scan_required_files():
+    """Map each REQUIRED_FILES path to its DirEntry (None if missing), one scandir per directory"""
+    by_directory = {}
+    for path in REQUIRED_FILES.values():
+        by_directory.setdefault(os.path.dirname(path) or '.', []).append(path)
+    
+    found = {}
+    for directory, paths in by_directory.items():
+        try:
+            with os.scandir(directory) as it:
+                present = {entry.name: entry for entry in it}
+        except OSError:
+            present = {}
+        for path in paths:
+            found[path] = present.get(os.path.basename(path))
+    return found
+
+def package_origin(package):
+    """Return where package would be imported from, or None if it isn't installed"""
+    from importlib.util import find_spec
+    
+    try:
+        spec = find_spec(package)
+    except ImportError:  # Parent package (RPi) not installed
+        return None
+    return spec.origin if spec is not None else None
+
+def dependency_cache_key():
+    """Hash the inputs of the dependency check; None if a required file is missing"""
+    import hashlib
+    
+    digest = hashlib.sha1()
+    try:
+        for path in REQUIRED_FILES.values():
+            digest.update(str(os.stat(path).st_mtime_ns).encode())
+    except OSError:
+        return None
+    digest.update(sys.executable.encode())
+    digest.update(sys.version.encode())
+    # Probed state: disabling SPI or uninstalling a package invalidates the key
+    digest.update(b'spi' if os.path.exists(SPI_DEVICE) else b'no-spi')
+    for package in REQUIRED_PACKAGES:
+        digest.update(repr(package_origin(package)).encode())
+    try:
+        with open('/proc/device-tree/model', 'rb') as f:
+            digest.update(f.read())  # Raspberry Pi model
+    except OSError:
+        pass
+    return digest.hexdigest()
+
+def load_dependency_cache():
+    """Return the key of the last passing check, or None if absent or unreadable"""
+    try:
+        with open(DEPS_CACHE_FILE, 'r') as f:
+            return f.read(64).strip() or None
+    except (OSError, UnicodeDecodeError):
+        return None
+
+def save_dependency_cache(key, ok):
+    """Remember a passing check under key, or drop the cache after a failure"""
+    try:
+        if ok and key is not None:
+            os.makedirs(os.path.dirname(DEPS_CACHE_FILE), exist_ok=True)
+            with open(DEPS_CACHE_FILE, 'w') as f:
+                f.write(key + '\n')
+        elif os.path.exists(DEPS_CACHE_FILE):
+            os.remove(DEPS_CACHE_FILE)
+    except OSError:
+        pass
+
+def run_script(script):
+    """Run a Python script in this interpreter as its __main__ module"""
+    import runpy
+    
+    saved_argv, saved_path = sys.argv, sys.path[:]
+    sys.argv = [script]
+    sys.path.insert(0, os.path.dirname(os.path.abspath(script)))
+    try:
+        runpy.run_path(script, run_name='__main__')
+    except SystemExit:
+        pass  # Script called sys.exit(); return to the caller instead
+    finally:
+        sys.argv = saved_argv
+        sys.path[:] = saved_path
+
+def receiver_main(script):
+    """Receiver process entry point; records its PID while the script runs"""
+    import signal
+    
+    # Don't inherit the controller's handlers; exit through finally instead
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    signal.signal(signal.SIGTERM, lambda sig, frame: sys.exit(0))
+    
+    with open(RECEIVER_PID_FILE, 'w') as f:
+        f.write(str(os.getpid()))
+    try:
+        run_script(script)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        try:
+            os.remove(RECEIVER_PID_FILE)
+        except OSError:
+            pass
+
+def read_receiver_pid():
+    """Return the PID of a receiver started through this script, or None"""
+    try:
+        with open(RECEIVER_PID_FILE, 'r') as f:
+            pid = int(f.read().strip())
+        # A file left behind by SIGKILL or power loss may name a reused PID;
+        # the forked receiver keeps this script's command line, so check it
+        with open(f'/proc/{pid}/cmdline', 'rb') as f:
+            cmdline = f.read()
+    except (OSError, ValueError):
+        return None
+    if pid == os.getpid() or os.path.basename(__file__).encode() not in cmdline:
+        return None
+    return pid
+
+def find_receiver_pids(pattern=b'receiver_fixed.py'):
+    """Return PIDs whose command line contains pattern, like pgrep -f without the fork"""
+    pids = []
+    own_pid = os.getpid()
+    try:
+        entries = os.listdir('/proc')
+    except OSError:
+        return pids
+    for entry in entries:
+        if not entry.isdigit() or int(entry) == own_pid:
+            continue
+        try:
+            with open(f'/proc/{entry}/cmdline', 'rb') as f:
+                if pattern in f.read():
+                    pids.append(int(entry))
+        except OSError:
+            continue  # Process exited or is not readable
+    return pids
 
 class AirQualityMonitor:
-    def __init__(self, mode='receiver', debug=False):
+    # Risk category prefix -> Colors attribute (looked up late so
+    # Colors.disable() still applies)
+    _RISK_COLORS = (
+        ('Good', 'GREEN'),
+        ('Moderate', 'YELLOW'),
+        ('Unhealthy', 'RED'),
+        ('Very Unhealthy', 'RED'),
+    )
+    
+    def __init__(self, mode='receiver', debug=False, poll_interval=5.0):
         self.mode = mode
         self.debug = debug
+        self.poll_interval = poll_interval
         self.running = True
         self.receiver_process = None
         
         # Setup signal handlers
+        import signal
         signal.signal(signal.SIGINT, self.signal_handler)
         signal.signal(signal.SIGTERM, self.signal_handler)
     
@@ -55,6 +338,8 @@ class AirQualityMonitor:
     
     def print_header(self):
         """Print application header"""
+        from datetime import datetime
+        
         print(f"\n{Colors.CYAN}{Colors.BOLD}")
         print("=" * 70)
         print("     AIR QUALITY INDEX MONITORING & RISK ANALYTICS")
@@ -66,18 +351,23 @@ class AirQualityMonitor:
         print("=" * 70 + "\n")
     
     def check_dependencies(self):
+        """Check dependencies, skipping the probe if an identical setup passed before"""
+        cache_key = dependency_cache_key()
+        if cache_key is not None and load_dependency_cache() == cache_key:
+            print(f"{Colors.GREEN}✓ All dependencies satisfied (cached){Colors.RESET}\n")
+            return True
+        
+        ok = self.probe_dependencies(scan_required_files())
+        save_dependency_cache(cache_key, ok)
+        return ok
+    
+    def probe_dependencies(self, found):
         """Check if required files and dependencies exist"""
         print(f"{Colors.BLUE}Checking dependencies...{Colors.RESET}")
         
-        required_files = {
-            'receiver': 'receiver/receiver_fixed.py',
-            'analytics': 'analytics/aqi_forecasting.py',
-            'dashboard': 'dashboard/index.html'
-        }
-        
         missing = []
-        for name, path in required_files.items():
-            if not os.path.exists(path):
+        for name, path in REQUIRED_FILES.items():
+            if found[path] is None:
                 missing.append(f"{name} ({path})")
                 print(f"{Colors.RED}✗ Missing: {path}{Colors.RESET}")
             else:
@@ -89,18 +379,16 @@ class AirQualityMonitor:
                 print(f"  - {item}")
             return False
         
-        # Check Python packages
-        try:
-            import spidev
-            import RPi.GPIO
-            print(f"{Colors.GREEN}✓ Python dependencies installed{Colors.RESET}")
-        except ImportError as e:
-            print(f"{Colors.RED}✗ Missing Python package: {e}{Colors.RESET}")
-            print(f"{Colors.YELLOW}Install with: sudo pip3 install spidev RPi.GPIO{Colors.RESET}")
-            return False
+        # Check Python packages (locate them without importing the C extensions)
+        for package in REQUIRED_PACKAGES:
+            if package_origin(package) is None:
+                print(f"{Colors.RED}✗ Missing Python package: {package}{Colors.RESET}")
+                print(f"{Colors.YELLOW}Install with: sudo pip3 install spidev RPi.GPIO{Colors.RESET}")
+                return False
+        print(f"{Colors.GREEN}✓ Python dependencies installed{Colors.RESET}")
         
         # Check SPI
-        if not os.path.exists('/dev/spidev0.0'):
+        if not os.path.exists(SPI_DEVICE):
             print(f"{Colors.RED}✗ SPI not enabled{Colors.RESET}")
             print(f"{Colors.YELLOW}Enable with: sudo raspi-config → Interface Options → SPI{Colors.RESET}")
             return False
@@ -112,6 +400,8 @@ class AirQualityMonitor:
     
     def run_receiver(self):
         """Run the LoRa receiver"""
+        import multiprocessing
+        
         print(f"{Colors.CYAN}Starting LoRa Receiver...{Colors.RESET}\n")
         
         receiver_script = 'receiver/receiver_debug.py' if self.debug else 'receiver/receiver_fixed.py'
@@ -121,8 +411,13 @@ class AirQualityMonitor:
             return
         
         try:
-            # Run receiver script
-            subprocess.run(['python3', receiver_script])
+            # Run receiver script in a child process the signal handler can stop
+            self.receiver_process = multiprocessing.Process(
+                target=receiver_main,
+                args=(receiver_script,),
+                name='receiver')
+            self.receiver_process.start()
+            self.receiver_process.join()
         except KeyboardInterrupt:
             print(f"\n{Colors.YELLOW}Receiver stopped by user{Colors.RESET}")
         except Exception as e:
@@ -146,12 +441,16 @@ class AirQualityMonitor:
             return
         
         try:
-            subprocess.run(['python3', analytics_script])
+            run_script(analytics_script)
         except Exception as e:
             print(f"{Colors.RED}Error running analytics: {e}{Colors.RESET}")
     
     def run_dashboard(self):
         """Start web dashboard server"""
+        import threading
+        from functools import partial
+        from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+        
         print(f"{Colors.CYAN}Starting Web Dashboard...{Colors.RESET}\n")
         
         dashboard_path = 'dashboard'
@@ -167,18 +466,121 @@ class AirQualityMonitor:
         print(f"{Colors.YELLOW}Press Ctrl+C to stop{Colors.RESET}\n")
         
         try:
-            os.chdir(dashboard_path)
-            subprocess.run(['python3', '-m', 'http.server', str(port)])
-        except KeyboardInterrupt:
-            print(f"\n{Colors.YELLOW}Dashboard server stopped{Colors.RESET}")
+            handler = partial(SimpleHTTPRequestHandler, directory=dashboard_path)
+            server = ThreadingHTTPServer(('', port), handler)
         except Exception as e:
             print(f"{Colors.RED}Error starting dashboard: {e}{Colors.RESET}")
+            return
+        
+        server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+        server_thread.start()
+        try:
+            server_thread.join()
+        except KeyboardInterrupt:
+            print(f"\n{Colors.YELLOW}Dashboard server stopped{Colors.RESET}")
+        finally:
+            server.shutdown()
+            server.server_close()
+    
+    def watch_files(self, paths):
+        """Yield the set of paths that changed, using inotify when available"""
+        try:
+            from inotify_simple import INotify, flags as inotify_flags
+        except ImportError:
+            INotify = None
+        
+        paths = set(paths)
+        directories = {os.path.dirname(path) or '.' for path in paths}
+        if INotify is None or any(is_remote_filesystem(d) for d in directories):
+            yield from self.poll_files(paths)
+            return
+        
+        with INotify() as inotify:
+            watched = {}
+            for directory in directories:
+                wd = inotify.add_watch(directory, inotify_flags.MODIFY |
+                                       inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO)
+                watched[wd] = directory
+            yield paths  # Show the current state straight away
+            while self.running:
+                changed = set()
+                for event in inotify.read(timeout=1000):
+                    path = os.path.join(watched.get(event.wd, ''), event.name)
+                    if path in paths:
+                        changed.add(path)
+                if changed:
+                    yield changed
+    
+    def poll_files(self, paths):
+        """Fallback watcher: stat each path once per poll interval"""
+        last_sizes = dict.fromkeys(paths, 0)
+        while self.running:
+            changed = set()
+            for path in last_sizes:
+                try:
+                    current_size = os.path.getsize(path)
+                except OSError:
+                    continue
+                if current_size != last_sizes[path]:
+                    last_sizes[path] = current_size
+                    changed.add(path)
+            if changed:
+                yield changed
+            time.sleep(self.poll_interval)
+    
+    def show_new_alerts(self, alert_file, position):
+        """Print complete alert lines appended after position and return the new position"""
+        lines, new_position = read_appended(alert_file, position)
+        for line in lines:
+            if line.strip():
+                alert = line.decode('utf-8', errors='replace').strip()
+                sys.stdout.write(f"{Colors.RED}{Colors.BOLD}ALERT: {alert}{Colors.RESET}\n")
+        sys.stdout.flush()
+        return new_position
+    
+    def show_latest_record(self, data_file, position):
+        """Print the last record appended after position and return the new position"""
+        lines, new_position = read_appended(data_file, position, skip_header=True,
+                                           from_tail=True)
+        last_line = next((line for line in reversed(lines) if line.strip()), None)
+        if last_line is None:
+            return new_position
+        
+        parts = next(csv.reader([last_line.decode('utf-8', errors='replace').strip()]))
+        
+        if len(parts) >= 6:
+            timestamp = parts[0]
+            temp = parts[2]
+            humidity = parts[3]
+            pm25 = parts[4]
+            aqi = parts[5]
+            risk = parts[6] if len(parts) > 6 else 'Unknown'
+            
+            # Color code based on risk
+            color_name = next((name for prefix, name in self._RISK_COLORS
+                               if risk.startswith(prefix)), 'MAGENTA')
+            risk_color = getattr(Colors, color_name)
+            
+            # One write per record instead of one per line
+            sys.stdout.write(
+                f"\n{Colors.CYAN}[{timestamp}]{Colors.RESET}\n"
+                f"Temperature: {Colors.BOLD}{temp}°C{Colors.RESET}\n"
+                f"Humidity: {Colors.BOLD}{humidity}%{Colors.RESET}\n"
+                f"PM2.5: {Colors.BOLD}{pm25} µg/m³{Colors.RESET}\n"
+                f"AQI: {Colors.BOLD}{aqi}{Colors.RESET}\n"
+                f"Risk: {risk_color}{Colors.BOLD}{risk}{Colors.RESET}\n"
+                f"{'-' * 50}\n"
+            )
+            sys.stdout.flush()
+        
+        return new_position
     
     def run_monitor(self):
         """Monitor system status and display live data"""
         print(f"{Colors.CYAN}System Monitor Mode{Colors.RESET}\n")
         
         data_file = 'receiver/air_quality_data.csv'
+        alert_file = 'receiver/air_quality_alerts.log'
         
         print(f"{Colors.BLUE}Monitoring: {data_file}{Colors.RESET}")
         print(f"{Colors.YELLOW}Press Ctrl+C to stop{Colors.RESET}\n")
@@ -189,49 +591,19 @@ class AirQualityMonitor:
                 print(f"{Colors.RED}No data file found. Start receiver first.{Colors.RESET}")
                 return
             
-            # Monitor file for changes
-            last_size = 0
-            while self.running:
-                if os.path.exists(data_file):
-                    current_size = os.path.getsize(data_file)
-                    
-                    if current_size != last_size:
-                        # Read last line
-                        with open(data_file, 'r') as f:
-                            lines = f.readlines()
-                            if len(lines) > 1:  # Skip header
-                                last_line = lines[-1].strip()
-                                parts = last_line.split(',')
-                                
-                                if len(parts) >= 6:
-                                    timestamp = parts[0]
-                                    temp = parts[2]
-                                    humidity = parts[3]
-                                    pm25 = parts[4]
-                                    aqi = parts[5]
-                                    risk = parts[6] if len(parts) > 6 else 'Unknown'
-                                    
-                                    # Color code based on risk
-                                    if 'Good' in risk:
-                                        risk_color = Colors.GREEN
-                                    elif 'Moderate' in risk:
-                                        risk_color = Colors.YELLOW
-                                    elif 'Unhealthy' in risk:
-                                        risk_color = Colors.RED
-                                    else:
-                                        risk_color = Colors.MAGENTA
-                                    
-                                    print(f"\n{Colors.CYAN}[{timestamp}]{Colors.RESET}")
-                                    print(f"Temperature: {Colors.BOLD}{temp}°C{Colors.RESET}")
-                                    print(f"Humidity: {Colors.BOLD}{humidity}%{Colors.RESET}")
-                                    print(f"PM2.5: {Colors.BOLD}{pm25} µg/m³{Colors.RESET}")
-                                    print(f"AQI: {Colors.BOLD}{aqi}{Colors.RESET}")
-                                    print(f"Risk: {risk_color}{Colors.BOLD}{risk}{Colors.RESET}")
-                                    print("-" * 50)
-                        
-                        last_size = current_size
-                
-                time.sleep(1)
+            # Monitor files for changes, reading only the bytes appended since
+            # the last event. Start from the current last record (found by
+            # seeking back from EOF) and show only alerts raised from now on.
+            data_position = tail_position(data_file)
+            alert_position = (None, 0)
+            if os.path.exists(alert_file):
+                alert_stat = os.stat(alert_file)
+                alert_position = (alert_stat.st_ino, alert_stat.st_size)
+            for changed in self.watch_files([data_file, alert_file]):
+                if data_file in changed:
+                    data_position = self.show_latest_record(data_file, data_position)
+                if alert_file in changed and os.path.exists(alert_file):
+                    alert_position = self.show_new_alerts(alert_file, alert_position)
         
         except KeyboardInterrupt:
             print(f"\n{Colors.YELLOW}Monitor stopped{Colors.RESET}")
@@ -282,8 +654,7 @@ class AirQualityMonitor:
         # Check data file
         data_file = 'receiver/air_quality_data.csv'
         if os.path.exists(data_file):
-            with open(data_file, 'r') as f:
-                lines = len(f.readlines()) - 1  # Exclude header
+            lines = max(count_lines(data_file) - 1, 0)  # Exclude header
             print(f"{Colors.GREEN}✓{Colors.RESET} Data file: {lines} records")
         else:
             print(f"{Colors.RED}✗{Colors.RESET} No data file found")
@@ -296,16 +667,17 @@ class AirQualityMonitor:
         else:
             print(f"{Colors.YELLOW}!{Colors.RESET} No alerts logged")
         
-        # Check processes
-        try:
-            result = subprocess.run(['pgrep', '-f', 'receiver_fixed.py'], 
-                                  capture_output=True, text=True)
-            if result.stdout:
-                print(f"{Colors.GREEN}✓{Colors.RESET} Receiver: Running (PID: {result.stdout.strip()})")
-            else:
-                print(f"{Colors.YELLOW}!{Colors.RESET} Receiver: Not running")
-        except:
-            pass
+        # Check processes: receivers started through this script record a PID
+        # file; ones started directly (shell, systemd) are found in /proc
+        receiver_pids = set(find_receiver_pids())
+        receiver_pid = read_receiver_pid()
+        if receiver_pid is not None:
+            receiver_pids.add(receiver_pid)
+        if receiver_pids:
+            pids = ' '.join(str(pid) for pid in sorted(receiver_pids))
+            print(f"{Colors.GREEN}✓{Colors.RESET} Receiver: Running (PID: {pids})")
+        else:
+            print(f"{Colors.YELLOW}!{Colors.RESET} Receiver: Not running")
         
         print()
     
@@ -316,8 +688,9 @@ class AirQualityMonitor:
         data_file = 'receiver/air_quality_data.csv'
         if os.path.exists(data_file):
             try:
-                subprocess.run(['tail', '-20', data_file])
-            except:
+                for line in tail_lines(data_file, 20):
+                    print(line)
+            except OSError:
                 print(f"{Colors.RED}Error reading logs{Colors.RESET}")
         else:
             print(f"{Colors.RED}No data file found{Colors.RESET}")
@@ -348,9 +721,12 @@ class AirQualityMonitor:
             print(f"{Colors.RED}Invalid mode: {self.mode}{Colors.RESET}")
 
 
-def main():
-    """Main entry point"""
+def build_parser(exit_on_error=True):
+    """Build the command-line parser"""
+    import argparse
+    
     parser = argparse.ArgumentParser(
+        exit_on_error=exit_on_error,
         description='Air Quality Monitor - Control Script',
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
@@ -361,6 +737,7 @@ Examples:
   sudo python3 main.py --mode dashboard   # Start dashboard
   sudo python3 main.py --mode monitor     # Live monitoring
   sudo python3 main.py --debug            # Enable debug mode
+  sudo python3 main.py --config aqi.yml   # Load defaults from YAML
         """
     )
     
@@ -369,15 +746,97 @@ Examples:
                        default='menu',
                        help='Operation mode (default: menu)')
     
+    parser.add_argument('--config',
+                       metavar='PATH',
+                       help='YAML file providing defaults for these options')
+    
     parser.add_argument('--debug',
                        action='store_true',
                        help='Enable debug mode with verbose output')
     
+    parser.add_argument('--poll-interval',
+                       type=float,
+                       default=5.0,
+                       metavar='SECONDS',
+                       help='File check interval in monitor mode when inotify is unavailable (default: 5)')
+    
+    parser.add_argument('--no-color',
+                       action='store_true',
+                       help='Disable colored output (also implied when stdout is not a TTY or NO_COLOR is set)')
+    
     parser.add_argument('--version',
                        action='version',
                        version='Air Quality Monitor v1.0.0')
     
+    return parser
+
+
+@functools.cache
+def load_config(path):
+    """Load option defaults from a YAML config file"""
+    import yaml
+    
+    with open(path, 'r') as f:
+        config = yaml.safe_load(f) or {}
+    if not isinstance(config, dict):
+        raise ValueError('top level must be a mapping of option names to values')
+    return {str(key).replace('-', '_'): value for key, value in config.items()}
+
+
+def config_defaults(config):
+    """Validate config values through the parser's own options and return them"""
+    import argparse
+    
+    parser = build_parser(exit_on_error=False)
+    actions = {action.dest: action for action in parser._actions
+               if action.option_strings and action.dest not in ('help', 'version', 'config')}
+    
+    # Turn the mapping into the command line it stands for, so choices and
+    # types are checked exactly as for real arguments
+    tokens = []
+    for key, value in config.items():
+        action = actions.get(key)
+        if action is None:
+            raise ValueError(f"unknown option '{key}'")
+        option = action.option_strings[0]
+        if action.nargs == 0:  # On/off flags such as --debug
+            if not isinstance(value, bool):
+                raise ValueError(f"'{key}' must be true or false")
+            if value:
+                tokens.append(option)
+        elif isinstance(value, (str, int, float)) and not isinstance(value, bool):
+            tokens.append(f"{option}={value}")
+        else:
+            raise ValueError(f"'{key}' must be a single value")
+    
+    try:
+        args = parser.parse_args(tokens)
+    except argparse.ArgumentError as e:
+        raise ValueError(str(e))
+    return {key: getattr(args, key) for key in config}
+
+
+@functools.cache
+def get_args():
+    """Parse the command line once; --config values become the defaults"""
+    parser = build_parser()
+    known, _ = parser.parse_known_args()
+    if known.config:
+        try:
+            parser.set_defaults(**config_defaults(load_config(known.config)))
+        except Exception as e:
+            parser.error(f"cannot load config {known.config}: {e}")
     args = parser.parse_args()
+    if not (math.isfinite(args.poll_interval) and args.poll_interval > 0):
+        parser.error("--poll-interval must be a finite number greater than 0")
+    return args
+
+
+def main():
+    """Main entry point"""
+    args = get_args()
+    if args.no_color:
+        Colors.disable()
     
     # Check if running as root
     if os.geteuid() != 0:
@@ -386,7 +845,8 @@ Examples:
         sys.exit(1)
     
     # Create and run monitor
-    monitor = AirQualityMonitor(mode=args.mode, debug=args.debug)
+    monitor = AirQualityMonitor(mode=args.mode, debug=args.debug,
+                                poll_interval=args.poll_interval)
     monitor.run()
 
 
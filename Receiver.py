@@ -18,7 +18,6 @@
 #include <SPI.h>
 #include <LoRa.h>
 #include <DHT.h>
-#include <ArduinoJson.h>
 #include <SD.h>
 
 // ===== PIN DEFINITIONS =====
@@ -52,7 +51,11 @@
 #define NODE_ID 1               // Unique ID for this sensor node
 #define SENSOR_READ_INTERVAL 5000      // Read sensors every 5 seconds
 #define LORA_TRANSMIT_INTERVAL 30000   // Transmit every 30 seconds
+#define SD_WRITE_INTERVAL 10000        // Log to SD card every 10 seconds
 #define BAUD_RATE 115200
+#define SD_FLUSH_EVERY 6               // Flush SD log every 6 rows (~1 minute)
+#define LORA_BINARY_PAYLOAD 0          // 0 = JSON (current receiver), 1 = packed binary packet
+#define LORA_PACKET_VERSION 1          // First byte of every binary packet
 
 // ===== OBJECTS =====
 DHT dht(DHT_PIN, DHT_TYPE);
@@ -70,12 +73,61 @@ struct SensorData {
   int aqi;
 };
 
+// ===== LORA PACKET (binary payload, little-endian, 22 bytes) =====
+// Enable with LORA_BINARY_PAYLOAD once the receiver decodes it with
+// struct.unpack('<BBHIhHHHHHH', payload)
+struct __attribute__((packed)) LoRaPacket {
+  uint8_t version;     // LORA_PACKET_VERSION
+  uint8_t node_id;
+  uint16_t packet;
+  uint32_t ts;         // seconds since boot
+  int16_t temp_dC;     // temperature x10 (°C)
+  uint16_t hum_dP;     // humidity x10 (%)
+  uint16_t pm25_dU;    // PM2.5 x10 (µg/m³)
+  uint16_t pm10_dU;    // PM10 x10 (µg/m³)
+  uint16_t gas;
+  uint16_t smoke;
+  uint16_t aqi;
+};
+
+// ===== AQI BREAKPOINTS =====
+// EPA concentration ranges and the AQI range each maps to
+struct Bp {
+  float c_lo, c_hi;
+  int a_lo, a_hi;
+};
+
+static const Bp PM25_BP[] = {
+  {0.0, 12.0, 0, 50},
+  {12.1, 35.4, 51, 100},
+  {35.5, 55.4, 101, 150},
+  {55.5, 150.4, 151, 200},
+  {150.5, 250.4, 201, 300},
+  {250.5, 500.0, 301, 500}
+};
+
+static const Bp PM10_BP[] = {
+  {0, 54, 0, 50},
+  {55, 154, 51, 100},
+  {155, 254, 101, 150},
+  {255, 354, 151, 200},
+  {355, 424, 201, 300},
+  {425, 604, 301, 500}
+};
+
 SensorData currentData;
-unsigned long lastSensorRead = 0;
-unsigned long lastLoRaTransmit = 0;
-unsigned long lastSDWrite = 0;
 int packetCounter = 0;
 
+// ===== FREERTOS =====
+#define TASK_STACK_SIZE 4096
+#define CORE_0 0
+#define CORE_1 1
+SemaphoreHandle_t dataMutex;  // Guards currentData
+SemaphoreHandle_t spiMutex;   // LoRa and SD card share the SPI bus
+
+File logFile;              // Kept open; reopening re-walks the FAT each time
+int sdWritesSinceFlush = 0;
+
 // ===== SETUP =====
 void setup() {
   Serial.begin(BAUD_RATE);
@@ -93,6 +145,7 @@ void setup() {
   // Initialize PMS5003
   Serial.print("Initializing PMS5003...");
   pmsSerial.begin(9600, SERIAL_8N1, PMS_RX, PMS_TX);
+  pmsSerial.setTimeout(50); // Upper bound for reading the rest of a frame
   Serial.println("OK");
   
   // Initialize SD Card
@@ -104,11 +157,13 @@ void setup() {
   } else {
     Serial.println("OK");
     createCSVHeader();
+    logFile = SD.open("/aqi_data.csv", FILE_APPEND);
   }
   
   // Initialize LoRa
   Serial.print("Initializing LoRa...");
   LoRa.setPins(LORA_SS, LORA_RST, LORA_DIO0);
+  LoRa.setSPIFrequency(10E6);         // 10 MHz SPI (library default is 8 MHz)
   
   if (!LoRa.begin(LORA_FREQUENCY)) {
     Serial.println("FAILED!");
@@ -133,44 +188,71 @@ void setup() {
   Serial.println("=================================\n");
   
   delay(2000);
+  
+  // Sampling, SD logging and LoRa each run in their own task and sleep
+  // until their next deadline instead of polling from loop()
+  dataMutex = xSemaphoreCreateMutex();
+  spiMutex = xSemaphoreCreateMutex();
+  xTaskCreatePinnedToCore(sensorTask, "sensor", TASK_STACK_SIZE, NULL, 1, NULL, CORE_1);
+  xTaskCreatePinnedToCore(sdTask, "sd", TASK_STACK_SIZE, NULL, 1, NULL, CORE_1);
+  xTaskCreatePinnedToCore(loraTask, "lora", TASK_STACK_SIZE, NULL, 1, NULL, CORE_0);
 }
 
 // ===== MAIN LOOP =====
 void loop() {
-  unsigned long currentMillis = millis();
-  
-  // Read sensors at defined interval
-  if (currentMillis - lastSensorRead >= SENSOR_READ_INTERVAL) {
+  vTaskDelete(NULL); // All work happens in the tasks started by setup()
+}
+
+// ===== TASKS =====
+// Locks are always taken in the order dataMutex, then spiMutex
+void sensorTask(void* param) {
+  TickType_t lastWake = xTaskGetTickCount();
+  for (;;) {
+    xSemaphoreTake(dataMutex, portMAX_DELAY);
     readAllSensors();
     calculateAQI();
     displayReadings();
+    xSemaphoreGive(dataMutex);
     
-    // Write to SD card every 10 seconds
-    if (currentMillis - lastSDWrite >= 10000) {
-      writeToSDCard();
-      lastSDWrite = currentMillis;
-    }
+    vTaskDelayUntil(&lastWake, pdMS_TO_TICKS(SENSOR_READ_INTERVAL));
+  }
+}
+
+void sdTask(void* param) {
+  TickType_t lastWake = xTaskGetTickCount();
+  for (;;) {
+    vTaskDelayUntil(&lastWake, pdMS_TO_TICKS(SD_WRITE_INTERVAL));
     
-    lastSensorRead = currentMillis;
+    xSemaphoreTake(dataMutex, portMAX_DELAY);
+    xSemaphoreTake(spiMutex, portMAX_DELAY);
+    writeToSDCard();
+    xSemaphoreGive(spiMutex);
+    xSemaphoreGive(dataMutex);
   }
-  
-  // Transmit via LoRa at defined interval
-  if (currentMillis - lastLoRaTransmit >= LORA_TRANSMIT_INTERVAL) {
+}
+
+void loraTask(void* param) {
+  TickType_t lastWake = xTaskGetTickCount();
+  for (;;) {
+    vTaskDelayUntil(&lastWake, pdMS_TO_TICKS(LORA_TRANSMIT_INTERVAL));
+    
+    xSemaphoreTake(dataMutex, portMAX_DELAY);
+    xSemaphoreTake(spiMutex, portMAX_DELAY);
     transmitData();
-    lastLoRaTransmit = currentMillis;
+    xSemaphoreGive(spiMutex);
+    xSemaphoreGive(dataMutex);
   }
-  
-  delay(100); // Small delay to prevent WDT reset
 }
 
 // ===== READ ALL SENSORS =====
 void readAllSensors() {
-  // Read DHT11
+  // Read DHT11 once; both getters then reuse the cached measurement
+  bool dhtOk = dht.read();
   currentData.temperature = dht.readTemperature();
   currentData.humidity = dht.readHumidity();
   
   // Check if DHT reading failed
-  if (isnan(currentData.temperature) || isnan(currentData.humidity)) {
+  if (!dhtOk || isnan(currentData.temperature) || isnan(currentData.humidity)) {
     Serial.println("Warning: DHT11 reading failed!");
     currentData.temperature = 0;
     currentData.humidity = 0;
@@ -191,36 +273,35 @@ void readAllSensors() {
 void readPMS5003() {
   if (pmsSerial.available() >= 32) {
     uint8_t buffer[32];
-    int index = 0;
     bool frameFound = false;
     
     // Look for start bytes 0x42 0x4d
     while (pmsSerial.available() > 0) {
-      uint8_t byte1 = pmsSerial.read();
-      if (byte1 == 0x42) {
-        uint8_t byte2 = pmsSerial.read();
-        if (byte2 == 0x4d) {
-          buffer[0] = byte1;
-          buffer[1] = byte2;
-          frameFound = true;
-          break;
-        }
+      if (pmsSerial.read() == 0x42 && pmsSerial.peek() == 0x4d) {
+        pmsSerial.read();
+        buffer[0] = 0x42;
+        buffer[1] = 0x4d;
+        frameFound = true;
+        break;
       }
     }
     
-    if (frameFound) {
-      // Read rest of frame
-      for (int i = 2; i < 32; i++) {
-        if (pmsSerial.available() > 0) {
-          buffer[i] = pmsSerial.read();
-        } else {
-          break;
-        }
+    // Read rest of frame in one call (bounded by pmsSerial timeout)
+    if (frameFound && pmsSerial.readBytes(&buffer[2], 30) == 30) {
+      // Checksum: sum of bytes 0..29 must equal the word in bytes 30..31
+      uint16_t sum = 0;
+      for (int i = 0; i < 30; i++) {
+        sum += buffer[i];
       }
+      uint16_t checksum = (buffer[30] << 8) | buffer[31];
       
-      // Extract PM2.5 and PM10 (atmospheric environment)
-      currentData.pm25 = (buffer[12] << 8) | buffer[13];
-      currentData.pm10 = (buffer[14] << 8) | buffer[15];
+      if (sum == checksum) {
+        // Extract PM2.5 and PM10 (atmospheric environment)
+        currentData.pm25 = (buffer[12] << 8) | buffer[13];
+        currentData.pm10 = (buffer[14] << 8) | buffer[15];
+      } else {
+        Serial.println("Warning: PMS5003 checksum mismatch, frame dropped");
+      }
     }
   } else {
     // No data available, use previous values or set to 0
@@ -233,46 +314,25 @@ void readPMS5003() {
   }
 }
 
+// Linear interpolation within the first breakpoint whose upper bound covers c
+int aqiFrom(float c, const Bp* table, int n) {
+  for (int i = 0; i < n; i++) {
+    if (c <= table[i].c_hi) {
+      const Bp& bp = table[i];
+      int aqi = bp.a_lo + (int)((c - bp.c_lo) * (bp.a_hi - bp.a_lo) / (bp.c_hi - bp.c_lo));
+      return aqi < bp.a_lo ? bp.a_lo : aqi;  // c fell in the gap below c_lo
+    }
+  }
+  return 500;
+}
+
 // ===== CALCULATE AQI =====
 void calculateAQI() {
   // Calculate AQI based on PM2.5 (primary pollutant)
-  float pm25 = currentData.pm25;
-  int pm25_aqi = 0;
-  
-  // EPA AQI breakpoints for PM2.5
-  if (pm25 <= 12.0) {
-    pm25_aqi = map(pm25 * 10, 0, 120, 0, 50);
-  } else if (pm25 <= 35.4) {
-    pm25_aqi = map(pm25 * 10, 121, 354, 51, 100);
-  } else if (pm25 <= 55.4) {
-    pm25_aqi = map(pm25 * 10, 355, 554, 101, 150);
-  } else if (pm25 <= 150.4) {
-    pm25_aqi = map(pm25 * 10, 555, 1504, 151, 200);
-  } else if (pm25 <= 250.4) {
-    pm25_aqi = map(pm25 * 10, 1505, 2504, 201, 300);
-  } else {
-    pm25_aqi = map(pm25 * 10, 2505, 5000, 301, 500);
-    if (pm25_aqi > 500) pm25_aqi = 500;
-  }
+  int pm25_aqi = aqiFrom(currentData.pm25, PM25_BP, sizeof(PM25_BP) / sizeof(PM25_BP[0]));
   
   // Calculate PM10 AQI
-  float pm10 = currentData.pm10;
-  int pm10_aqi = 0;
-  
-  if (pm10 <= 54) {
-    pm10_aqi = map(pm10, 0, 54, 0, 50);
-  } else if (pm10 <= 154) {
-    pm10_aqi = map(pm10, 55, 154, 51, 100);
-  } else if (pm10 <= 254) {
-    pm10_aqi = map(pm10, 155, 254, 101, 150);
-  } else if (pm10 <= 354) {
-    pm10_aqi = map(pm10, 255, 354, 151, 200);
-  } else if (pm10 <= 424) {
-    pm10_aqi = map(pm10, 355, 424, 201, 300);
-  } else {
-    pm10_aqi = map(pm10, 425, 604, 301, 500);
-    if (pm10_aqi > 500) pm10_aqi = 500;
-  }
+  int pm10_aqi = aqiFrom(currentData.pm10, PM10_BP, sizeof(PM10_BP) / sizeof(PM10_BP[0]));
   
   // Environmental correction factors
   float tempFactor = 1.0;
@@ -354,39 +414,63 @@ void displayReadings() {
 
 // ===== TRANSMIT DATA VIA LORA =====
 void transmitData() {
-  Serial.println(">>> Transmitting data via LoRa...");
-  
-  // Create JSON document
-  StaticJsonDocument<256> doc;
+  // Packets are sent asynchronously; beginPacket() fails while the
+  // previous one is still on air
+  if (!LoRa.beginPacket()) {
+    Serial.println("✗ LoRa busy, previous packet still transmitting\n");
+    return;
+  }
   
-  doc["node_id"] = NODE_ID;
-  doc["packet"] = packetCounter++;
-  doc["timestamp"] = currentData.timestamp;
-  doc["temp"] = round(currentData.temperature * 10) / 10.0;
-  doc["humidity"] = round(currentData.humidity * 10) / 10.0;
-  doc["pm25"] = round(currentData.pm25 * 10) / 10.0;
-  doc["pm10"] = round(currentData.pm10 * 10) / 10.0;
-  doc["gas"] = currentData.gasLevel;
-  doc["smoke"] = currentData.smokeLevel;
-  doc["aqi"] = currentData.aqi;
+  Serial.println(">>> Transmitting data via LoRa...");
   
-  // Serialize to string
-  String jsonString;
-  serializeJson(doc, jsonString);
+#if LORA_BINARY_PAYLOAD
+  // Fixed-size packed struct: ~6x less airtime than the JSON string
+  LoRaPacket pkt;
+  pkt.version = LORA_PACKET_VERSION;
+  pkt.node_id = NODE_ID;
+  pkt.packet = packetCounter++;
+  pkt.ts = currentData.timestamp;
+  pkt.temp_dC = (int16_t)round(currentData.temperature * 10);
+  pkt.hum_dP = (uint16_t)round(currentData.humidity * 10);
+  pkt.pm25_dU = (uint16_t)round(currentData.pm25 * 10);
+  pkt.pm10_dU = (uint16_t)round(currentData.pm10 * 10);
+  pkt.gas = currentData.gasLevel;
+  pkt.smoke = currentData.smokeLevel;
+  pkt.aqi = currentData.aqi;
+  size_t payloadSize = sizeof(pkt);
+  
+  // Send via LoRa, returning without waiting for the airtime
+  LoRa.write((const uint8_t*)&pkt, payloadSize);
+  LoRa.endPacket(true);
+#else
+  // Fixed-schema JSON formatted directly into a reused buffer
+  static char jsonBuffer[200];
+  int len = snprintf(jsonBuffer, sizeof(jsonBuffer),
+                     "{\"node_id\":%d,\"packet\":%d,\"timestamp\":%lu,"
+                     "\"temp\":%.1f,\"humidity\":%.1f,\"pm25\":%.1f,\"pm10\":%.1f,"
+                     "\"gas\":%d,\"smoke\":%d,\"aqi\":%d}",
+                     NODE_ID, packetCounter++, currentData.timestamp,
+                     currentData.temperature, currentData.humidity,
+                     currentData.pm25, currentData.pm10,
+                     currentData.gasLevel, currentData.smokeLevel,
+                     currentData.aqi);
+  if (len < 0) len = 0;
+  if (len >= (int)sizeof(jsonBuffer)) len = sizeof(jsonBuffer) - 1;
+  size_t payloadSize = len;
   
   Serial.print("JSON: ");
-  Serial.println(jsonString);
+  Serial.println(jsonBuffer);
   
-  // Send via LoRa
-  LoRa.beginPacket();
-  LoRa.print(jsonString);
-  LoRa.endPacket();
+  // Send via LoRa, returning without waiting for the airtime
+  LoRa.write((const uint8_t*)jsonBuffer, payloadSize);
+  LoRa.endPacket(true);
+#endif
   
   Serial.print("✓ Packet #");
   Serial.print(packetCounter);
-  Serial.println(" transmitted successfully!");
+  Serial.println(" queued for transmission");
   Serial.print("Size: ");
-  Serial.print(jsonString.length());
+  Serial.print(payloadSize);
   Serial.println(" bytes\n");
 }
 
@@ -405,32 +489,35 @@ void createCSVHeader() {
 }
 
 void writeToSDCard() {
-  File dataFile = SD.open("/aqi_data.csv", FILE_APPEND);
-  
-  if (dataFile) {
-    dataFile.print(currentData.timestamp);
-    dataFile.print(",");
-    dataFile.print(NODE_ID);
-    dataFile.print(",");
-    dataFile.print(currentData.temperature);
-    dataFile.print(",");
-    dataFile.print(currentData.humidity);
-    dataFile.print(",");
-    dataFile.print(currentData.pm25);
-    dataFile.print(",");
-    dataFile.print(currentData.pm10);
-    dataFile.print(",");
-    dataFile.print(currentData.gasLevel);
-    dataFile.print(",");
-    dataFile.print(currentData.smokeLevel);
-    dataFile.print(",");
-    dataFile.println(currentData.aqi);
-    
-    dataFile.close();
-    Serial.println("✓ Data written to SD card");
-  } else {
+  if (!logFile) {
     Serial.println("✗ Error writing to SD card");
+    return;
+  }
+  
+  // Build the whole row first so it reaches the FAT layer as one write
+  char buf[160];
+  int len = snprintf(buf, sizeof(buf), "%lu,%d,%.2f,%.2f,%.2f,%.2f,%d,%d,%d\r\n",
+                     currentData.timestamp, NODE_ID,
+                     currentData.temperature, currentData.humidity,
+                     currentData.pm25, currentData.pm10,
+                     currentData.gasLevel, currentData.smokeLevel,
+                     currentData.aqi);
+  if (len < 0) {
+    Serial.println("✗ Error formatting SD card row");
+    return;
+  }
+  if (len >= (int)sizeof(buf)) len = sizeof(buf) - 1;
+  
+  if (logFile.write((const uint8_t*)buf, len) != (size_t)len) {
+    Serial.println("✗ Error writing to SD card");
+    return;
+  }
+  
+  if (++sdWritesSinceFlush >= SD_FLUSH_EVERY) {
+    logFile.flush();
+    sdWritesSinceFlush = 0;
   }
+  Serial.println("✓ Data written to SD card");
 }
 
 // ===== UTILITY FUNCTIONS =====